@@ -1,26 +1,44 @@
-import os, sys, json, logging, argparse, asyncio, ctypes
-from logging.handlers import RotatingFileHandler
+import os, re, sys, json, logging, argparse, asyncio, ctypes
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from types import MappingProxyType
+from typing import Final, Mapping
 from pynput import keyboard
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_anthropic import ChatAnthropic
-from langchain_ollama import ChatOllama
+# langchain provider imports are deferred into the provider factories below;
+# each pulls a heavy dependency stack, so only the configured provider pays
+# its import cost.
 
 from src import Agent
 from src.controller.service import Controller
 
 # ---------- Utilities -------------------------------------------------------
-def has_screen_capture_permission() -> bool:
-    CoreGraphics = ctypes.cdll.LoadLibrary(
+# Load CoreGraphics once at import and declare the ctypes prototype so each
+# permission check is a single function-pointer call instead of a dyld lookup.
+if sys.platform == "darwin":
+    _CORE_GRAPHICS = ctypes.cdll.LoadLibrary(
         "/System/Library/Frameworks/CoreGraphics.framework/CoreGraphics"
     )
-    return bool(CoreGraphics.CGPreflightScreenCaptureAccess())
+    _CORE_GRAPHICS.CGPreflightScreenCaptureAccess.restype = ctypes.c_bool
+    _CORE_GRAPHICS.CGPreflightScreenCaptureAccess.argtypes = []
+else:
+    _CORE_GRAPHICS = None
+
+def has_screen_capture_permission() -> bool:
+    if _CORE_GRAPHICS is None:
+        return False
+    return bool(_CORE_GRAPHICS.CGPreflightScreenCaptureAccess())
 
 LOG_LEVEL_MAP = {
     "CRITICAL": logging.CRITICAL,
@@ -30,16 +48,21 @@ LOG_LEVEL_MAP = {
     "DEBUG":    logging.DEBUG,
 }
 
-HOTKEY_ALIASES = {
-    "command": "<cmd>",
-    "cmd": "<cmd>",
-    "shift": "<shift>",
-    "control": "<ctrl>",
-    "ctrl": "<ctrl>",
-    "option": "<alt>",
-    "alt": "<alt>",
-    "opt": "<alt>",
-}
+# Frozen alias table; interned keys let normalize_hotkey lookups take the
+# pointer-equality fast path.
+HOTKEY_ALIASES: Final[Mapping[str, str]] = MappingProxyType({
+    sys.intern(k): sys.intern(v)
+    for k, v in {
+        "command": "<cmd>",
+        "cmd": "<cmd>",
+        "shift": "<shift>",
+        "control": "<ctrl>",
+        "ctrl": "<ctrl>",
+        "option": "<alt>",
+        "alt": "<alt>",
+        "opt": "<alt>",
+    }.items()
+})
 
 def resolve_output_dir(cfg: dict, config_path: Path) -> Path:
     output_dir = (
@@ -66,27 +89,59 @@ def resolve_artifact_path(raw_path: str | None, output_dir: Path) -> str | None:
         path.parent.mkdir(parents=True, exist_ok=True)
     return str(path)
 
-def load_config(path: Path) -> dict:
-    if not path.exists():
-        raise FileNotFoundError(f"Config file {path} not found.")
-    with path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
+# Parsed configs keyed by (path, mtime_ns, size); a config edit changes the key
+# so stale entries are never served.
+_CFG_CACHE: dict[tuple[str, int, int], Mapping] = {}
+
+def load_config(path: Path) -> Mapping:
+    # stat() doubles as the existence check, saving the extra syscall that
+    # path.exists() would issue, and feeds the cache key.
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config file {path} not found.") from None
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    cached = _CFG_CACHE.get(key)
+    if cached is not None:
+        return cached
+    data = path.read_bytes()
+    cfg = orjson.loads(data) if orjson is not None else json.loads(data)
+    cfg = MappingProxyType(cfg)
+    _CFG_CACHE[key] = cfg
+    return cfg
+
+_HOTKEY_SPLIT_RE = re.compile(r"\s*\+\s*")
 
 def normalize_hotkey(hotkey: str) -> str:
     if not hotkey:
         return ""
-    parts = [p for p in hotkey.replace(" ", "").split("+") if p]
-    normalized = []
-    for part in parts:
-        token = part.strip()
-        lower = token.lower()
-        if lower in HOTKEY_ALIASES:
-            normalized.append(HOTKEY_ALIASES[lower])
-        elif lower.startswith("<") and lower.endswith(">"):
-            normalized.append(lower)
-        else:
-            normalized.append(lower)
-    return "+".join(normalized)
+    parts = _HOTKEY_SPLIT_RE.split(hotkey.strip().lower())
+    return "+".join(HOTKEY_ALIASES.get(p, p) for p in parts if p)
+
+class _ForceStopHotkey:
+    """Hotkey callback holding its state in slots instead of closure cells.
+
+    pynput invokes __call__ on its own listener thread, so the stop itself is
+    marshalled onto the event loop via call_soon_threadsafe.
+    """
+
+    __slots__ = ("loop", "agent", "agent_task", "log")
+
+    def __init__(self, loop, agent, agent_task, log):
+        self.loop = loop
+        self.agent = agent
+        self.agent_task = agent_task
+        self.log = log
+
+    def __call__(self):
+        self.loop.call_soon_threadsafe(self._force_stop)
+
+    def _force_stop(self):
+        self.log.warning("Force-stop hotkey pressed. Stopping agent now.")
+        self.agent.stop("force-stop hotkey")
+        if not self.agent_task.done():
+            self.agent_task.cancel()
+
 
 def register_force_stop_hotkey(
     loop: asyncio.AbstractEventLoop,
@@ -95,16 +150,9 @@ def register_force_stop_hotkey(
     hotkey: str,
     log: logging.Logger,
 ):
-    def _force_stop():
-        log.warning("Force-stop hotkey pressed. Stopping agent now.")
-        agent.stop("force-stop hotkey")
-        if not agent_task.done():
-            agent_task.cancel()
-
-    def _on_activate():
-        loop.call_soon_threadsafe(_force_stop)
-
-    listener = keyboard.GlobalHotKeys({hotkey: _on_activate})
+    listener = keyboard.GlobalHotKeys(
+        {hotkey: _ForceStopHotkey(loop, agent, agent_task, log)}
+    )
     listener.start()
     return listener
 
@@ -178,6 +226,7 @@ def build_openai_compatible_llm(
         kwargs["max_tokens"] = max_tokens
     if timeout is not None:
         kwargs["timeout"] = timeout
+    from langchain_openai import ChatOpenAI
     llm = ChatOpenAI(**kwargs)
     return configure_llm_capabilities(
         llm,
@@ -185,109 +234,144 @@ def build_openai_compatible_llm(
         supports_response_format=supports_response_format,
     )
 
-def build_llm(cfg: dict, *, enable_thinking: bool | None = None):
-    provider = cfg["provider"].lower()
-    api_key  = cfg.get("api_key") or os.getenv("API_KEY") or os.getenv("OPENAI_API_KEY")
+def _resolve_api_key(cfg: dict) -> str | None:
+    return cfg.get("api_key") or os.getenv("API_KEY") or os.getenv("OPENAI_API_KEY")
+
+
+def _make_openai_compatible(
+    cfg: dict,
+    *,
+    enable_thinking: bool | None = None,
+    default_base_url: str | None = None,
+    base_url_required: bool = False,
+    default_model_name: str | None = None,
+    temperature: float | None = 0.1,
+    supports_tool_calling: bool = True,
+    supports_response_format: bool = True,
+):
+    base_url = cfg.get("base_url") or default_base_url
+    if base_url_required and not base_url:
+        raise ValueError("OpenAI‑compatible provider requires 'base_url'.")
+    return build_openai_compatible_llm(
+        model_name=cfg.get("model_name") or default_model_name,
+        api_key=_resolve_api_key(cfg),
+        base_url=base_url,
+        temperature=temperature if temperature is not None else cfg.get("temperature", 0.3),
+        supports_tool_calling=supports_tool_calling,
+        supports_response_format=supports_response_format,
+        model_kwargs=_merge_model_kwargs(cfg, enable_thinking=enable_thinking),
+        max_tokens=cfg.get("max_tokens"),
+        timeout=cfg.get("timeout"),
+    )
+
+
+def _make_turix(cfg: dict, *, enable_thinking: bool | None = None):
+    return _make_openai_compatible(
+        cfg, enable_thinking=enable_thinking, base_url_required=True
+    )
+
+
+def _make_deepseek(cfg: dict, *, enable_thinking: bool | None = None):
+    return _make_openai_compatible(
+        cfg,
+        enable_thinking=enable_thinking,
+        default_base_url="https://api.deepseek.com/v1",
+        supports_tool_calling=False,
+        supports_response_format=False,
+    )
+
+
+def _make_minimax(cfg: dict, *, enable_thinking: bool | None = None):
+    return _make_openai_compatible(
+        cfg,
+        enable_thinking=enable_thinking,
+        default_base_url="https://api.minimax.chat/v1",
+        supports_tool_calling=False,
+        supports_response_format=False,
+    )
+
+
+def _make_kimi(cfg: dict, *, enable_thinking: bool | None = None):
+    return _make_openai_compatible(
+        cfg,
+        enable_thinking=enable_thinking,
+        default_base_url="https://api.moonshot.cn/v1",
+        supports_response_format=False,
+    )
+
+
+def _make_gpt(cfg: dict, *, enable_thinking: bool | None = None):
+    return _make_openai_compatible(
+        cfg,
+        enable_thinking=enable_thinking,
+        default_model_name="gpt-4.1-mini",
+        temperature=None,
+    )
+
+
+def _make_ollama(cfg: dict, *, enable_thinking: bool | None = None):
     model_name = cfg.get("model_name")
-    base_url = cfg.get("base_url")
-    model_kwargs = _merge_model_kwargs(cfg, enable_thinking=enable_thinking)
-    max_tokens = cfg.get("max_tokens")
-    timeout = cfg.get("timeout")
-
-    if provider == "turix":
-        if not base_url:
-            raise ValueError("OpenAI‑compatible provider requires 'base_url'.")
-        return build_openai_compatible_llm(
-            model_name=model_name,
-            api_key=api_key,
-            base_url=base_url,
-            temperature=0.1,
-            model_kwargs=model_kwargs,
-            max_tokens=max_tokens,
-            timeout=timeout,
-        )
+    if not model_name:
+        raise ValueError("Ollama provider requires 'model_name'.")
+    ollama_kwargs = {"model": model_name, "temperature": 0.3}
+    if cfg.get("base_url"):
+        ollama_kwargs["base_url"] = cfg["base_url"]
+    from langchain_ollama import ChatOllama
+    llm = ChatOllama(**ollama_kwargs)
+    return configure_llm_capabilities(
+        llm,
+        supports_tool_calling=bool(cfg.get("supports_tool_calling", True)),
+        # Disabled by default because some Ollama model/runtime combos fail with:
+        # "failed to load model vocabulary required for format"
+        supports_response_format=bool(cfg.get("supports_response_format", False)),
+    )
 
-    if provider == "deepseek":
-        return build_openai_compatible_llm(
-            model_name=model_name,
-            api_key=api_key,
-            base_url=base_url or "https://api.deepseek.com/v1",
-            temperature=0.1,
-            supports_tool_calling=False,
-            supports_response_format=False,
-            model_kwargs=model_kwargs,
-            max_tokens=max_tokens,
-            timeout=timeout,
-        )
 
-    if provider == "minimax":
-        return build_openai_compatible_llm(
-            model_name=model_name,
-            api_key=api_key,
-            base_url=base_url or "https://api.minimax.chat/v1",
-            temperature=0.1,
-            supports_tool_calling=False,
-            supports_response_format=False,
-            model_kwargs=model_kwargs,
-            max_tokens=max_tokens,
-            timeout=timeout,
-        )
+def _make_google_flash(cfg: dict, *, enable_thinking: bool | None = None):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash", api_key=_resolve_api_key(cfg), temperature=0.3
+    )
 
-    if provider == "kimi":
-        return build_openai_compatible_llm(
-            model_name=model_name,
-            api_key=api_key,
-            base_url=base_url or "https://api.moonshot.cn/v1",
-            temperature=0.1,
-            supports_tool_calling=True,
-            supports_response_format=False,
-            model_kwargs=model_kwargs,
-            max_tokens=max_tokens,
-            timeout=timeout,
-        )
 
-    if provider == "ollama":
-        if not model_name:
-            raise ValueError("Ollama provider requires 'model_name'.")
-        ollama_kwargs = {"model": model_name, "temperature": 0.3}
-        if base_url:
-            ollama_kwargs["base_url"] = base_url
-        llm = ChatOllama(**ollama_kwargs)
-        return configure_llm_capabilities(
-            llm,
-            supports_tool_calling=bool(cfg.get("supports_tool_calling", True)),
-            # Disabled by default because some Ollama model/runtime combos fail with:
-            # "failed to load model vocabulary required for format"
-            supports_response_format=bool(cfg.get("supports_response_format", False)),
-        )
+def _make_google_pro(cfg: dict, *, enable_thinking: bool | None = None):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-pro", api_key=_resolve_api_key(cfg), temperature=0.3
+    )
 
-    if provider == "google_flash":
-        return ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash", api_key=api_key, temperature=0.3
-        )
-    
-    if provider == "gpt":
-        return build_openai_compatible_llm(
-            model_name=model_name or "gpt-4.1-mini",
-            api_key=api_key,
-            base_url=base_url,
-            temperature=cfg.get("temperature", 0.3),
-            model_kwargs=model_kwargs,
-            max_tokens=max_tokens,
-            timeout=timeout,
-        )
 
-    if provider == "google_pro":
-        return ChatGoogleGenerativeAI(
-            model="gemini-2.5-pro", api_key=api_key, temperature=0.3
-        )
+def _make_anthropic(cfg: dict, *, enable_thinking: bool | None = None):
+    from langchain_anthropic import ChatAnthropic
+    return ChatAnthropic(model="claude-4-opus", api_key=_resolve_api_key(cfg), temperature=0.3)
 
-    if provider == "anthropic":
-        return ChatAnthropic(model="claude-4-opus", api_key=api_key, temperature=0.3)
 
-    raise ValueError(f"Unknown llm provider '{provider}'")
+_PROVIDERS = {
+    "turix": _make_turix,
+    "deepseek": _make_deepseek,
+    "minimax": _make_minimax,
+    "kimi": _make_kimi,
+    "ollama": _make_ollama,
+    "google_flash": _make_google_flash,
+    "gpt": _make_gpt,
+    "google_pro": _make_google_pro,
+    "anthropic": _make_anthropic,
+}
+
+
+def build_llm(cfg: dict, *, enable_thinking: bool | None = None):
+    provider = cfg["provider"].lower()
+    try:
+        factory = _PROVIDERS[provider]
+    except KeyError:
+        raise ValueError(f"Unknown llm provider '{provider}'") from None
+    return factory(cfg, enable_thinking=enable_thinking)
 
 # ---------- Main ------------------------------------------------------------
+# Active QueueListener, kept so re-entrant main() calls (tests, notebooks,
+# supervised restarts) replace it instead of stacking a second drain thread.
+_LOG_LISTENER: QueueListener | None = None
+
 def main(config_path: str = "config.json"):
     # Make config path relative to script location if it's a relative path
     if not Path(config_path).is_absolute():
@@ -304,18 +388,38 @@ def main(config_path: str = "config.json"):
             brain_enable_thinking = False
 
     # --- Logging -----------------------------------------------------------
-    log_level_str = cfg.get("logging_level", "DEBUG").upper()
+    # Default to INFO: at DEBUG every downstream debug call pays its full
+    # format-args evaluation even when nobody reads the output.
+    log_level_str = cfg.get("logging_level", "INFO").upper()
     use_plan = cfg.get("agent", {}).get("use_plan", False)
-    logging_level = LOG_LEVEL_MAP.get(log_level_str, logging.DEBUG)
+    logging_level = LOG_LEVEL_MAP.get(log_level_str, logging.INFO)
     
-    # Configure root logger first
+    # Configure root logger first. Log records go through a queue so the
+    # slow handlers (console write, file rotation) run on a background
+    # thread instead of blocking the asyncio loop.
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stream_handler = logging.StreamHandler()  # Console output
+    stream_handler.setFormatter(formatter)
+    file_handler = RotatingFileHandler(
+        str(output_dir / "logging.log"), maxBytes=20 * 1024 * 1024, backupCount=3
+    )
+    file_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        # Drop the old listener's exit hook too — QueueListener.stop is not
+        # idempotent and would raise if it ran again at interpreter exit.
+        atexit.unregister(_LOG_LISTENER.stop)
+    _LOG_LISTENER = listener
+    listener.start()
+    atexit.register(listener.stop)
+    # force=True tears down any stale root handlers from a previous run, so
+    # log records are never double-written after re-entry.
     logging.basicConfig(
         level=logging_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),  # Console output
-            RotatingFileHandler(str(output_dir / "logging.log"), maxBytes=20 * 1024 * 1024, backupCount=3)
-        ],
+        handlers=[QueueHandler(log_queue)],
         force=True,
     )
     
@@ -325,10 +429,12 @@ def main(config_path: str = "config.json"):
     log.propagate = True
     log.setLevel(logging_level)
     
-    # Also set logging for other relevant modules
-    logging.getLogger("src").setLevel(logging_level)
-    logging.getLogger("src.agent").setLevel(logging_level)
-    logging.getLogger("src.agent.message_manager").setLevel(logging_level)
+    # Only pin per-module levels when the config asks for a specific level;
+    # otherwise let them inherit from the root logger.
+    if "logging_level" in cfg:
+        logging.getLogger("src").setLevel(logging_level)
+        logging.getLogger("src.agent").setLevel(logging_level)
+        logging.getLogger("src.agent.message_manager").setLevel(logging_level)
     
     print(f"Logging level set to: {log_level_str}")
 
@@ -340,21 +446,6 @@ def main(config_path: str = "config.json"):
         )
         sys.exit(1)
 
-    # --- Build LLM & Agent --------------------------------------------------
-    brain_llm = build_llm(cfg["brain_llm"], enable_thinking=brain_enable_thinking)
-    actor_llm = build_llm(cfg["actor_llm"], enable_thinking=False)
-    memory_llm = build_llm(cfg["memory_llm"], enable_thinking=False)
-    if use_plan:
-        planner_llm = build_llm(cfg["planner_llm"], enable_thinking=True)
-    else:
-        planner_llm = None
-    log.info(
-        "Thinking config => brain=%s, actor=%s, memory=%s, planner=%s",
-        brain_enable_thinking,
-        False,
-        False,
-        bool(use_plan),
-    )
     agent_cfg = cfg["agent"]
     skills_dir = agent_cfg.get("skills_dir")
     if skills_dir:
@@ -385,7 +476,29 @@ def main(config_path: str = "config.json"):
         agent_cfg.get("summary_memory_budget"),
     )
 
-    agent = Agent(
+    async def build_llms():
+        # Client construction can touch the network (base-url probes, HTTP
+        # client init), so build the four LLMs concurrently in worker threads.
+        build_jobs = [
+            asyncio.to_thread(build_llm, cfg["brain_llm"], enable_thinking=brain_enable_thinking),
+            asyncio.to_thread(build_llm, cfg["actor_llm"], enable_thinking=False),
+            asyncio.to_thread(build_llm, cfg["memory_llm"], enable_thinking=False),
+        ]
+        if use_plan:
+            build_jobs.append(asyncio.to_thread(build_llm, cfg["planner_llm"], enable_thinking=True))
+        built = await asyncio.gather(*build_jobs)
+        planner_llm = built[3] if use_plan else None
+        log.info(
+            "Thinking config => brain=%s, actor=%s, memory=%s, planner=%s",
+            brain_enable_thinking,
+            False,
+            False,
+            bool(use_plan),
+        )
+        return built[0], built[1], built[2], planner_llm
+
+    def build_agent(brain_llm, actor_llm, memory_llm, planner_llm):
+        return Agent(
         task                    = agent_cfg["task"],
         brain_llm               = brain_llm,
         actor_llm               = actor_llm,
@@ -409,10 +522,11 @@ def main(config_path: str = "config.json"):
         save_planner_conversation_path = save_planner_conversation_path,
         save_planner_conversation_path_encoding = agent_cfg.get("save_planner_conversation_path_encoding", "utf-8"),
         artifacts_dir           = str(output_dir),
-    )
+        )
 
     async def runner():
         loop = asyncio.get_running_loop()
+        agent = build_agent(*await build_llms())
         agent_task = asyncio.create_task(agent.run(max_steps=agent_cfg.get("max_steps", 100)))
         listener = None
         if force_stop_hotkey:
@@ -1,276 +1,335 @@
-class OutputSchemas:
-    """
-    A container for all model output schemas and their associated response formats.
+import json
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+
+# Shared JSON bindings for the LLM request/response hot paths. Downstream
+# consumers import these instead of binding stdlib json directly, so the
+# whole agent picks up orjson when it is installed.
+if orjson is not None:
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    loads = orjson.loads
+else:
+    def dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    loads = json.loads
+
+
+def _intern_strings(obj, _memo=None):
+    """Recursively intern dict keys and string values of a schema.
+
+    Interned strings hit CPython's pointer-equality fast path on dict lookups,
+    and repeated tokens ("type", "object", "string", ...) share storage. A memo
+    keyed on object identity preserves shared subschema nodes.
     """
+    if _memo is None:
+        _memo = {}
+    if isinstance(obj, dict):
+        cached = _memo.get(id(obj))
+        if cached is not None:
+            return cached
+        interned = {sys.intern(k): _intern_strings(v, _memo) for k, v in obj.items()}
+        _memo[id(obj)] = interned
+        return interned
+    if isinstance(obj, list):
+        cached = _memo.get(id(obj))
+        if cached is not None:
+            return cached
+        interned = [_intern_strings(v, _memo) for v in obj]
+        _memo[id(obj)] = interned
+        return interned
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    return obj
+
+
+# Shared read-only subschema nodes. Identical shapes reference the same dict,
+# so the schema is assembled from far fewer BUILD_MAP ops at import and the
+# duplicate nodes share memory. Consumers treat the schema as read-only.
+_NUMBER = {"type": "number"}
+_STRING = {"type": "string"}
+_POSITION = {"type": "array", "items": _NUMBER}
+_POSITION_OBJ = {
+    "type": "object",
+    "properties": {"position": _POSITION},
+    "required": ["position"],
+}
+_OPTIONAL_TEXT_OBJ = {"type": "object", "properties": {"text": _STRING}}
+_SCROLL_OBJ = {
+    "type": "object",
+    "properties": {"position": _POSITION, "dx": _NUMBER, "dy": _NUMBER},
+    "required": ["position"],
+}
+
+
+def _build_action_schema() -> dict:
+    actions = {
+        # ----- task finished -----
+        "done": _OPTIONAL_TEXT_OBJ,
+
+        # ----- typing -----
+        "input_text": {
+            "type": "object",
+            "properties": {"text": _STRING},
+            "required": ["text"],
+        },
+
+        # ----- open app -----
+        "open_app": {
+            "type": "object",
+            "properties": {"app_name": _STRING},
+            "required": ["app_name"],
+        },
+
+        # ----- AppleScript -----
+        "run_apple_script": {
+            "type": "object",
+            "properties": {"script": _STRING},
+            "required": ["script"],
+        },
+
+        # ----- hotkeys -----
+        "Hotkey": {
+            "type": "object",
+            "properties": {"key": _STRING},
+            "required": ["key"],
+        },
+        "multi_Hotkey": {
+            "type": "object",
+            "properties": {"key1": _STRING, "key2": _STRING, "key3": _STRING},
+            "required": ["key1", "key2"],
+        },
+
+        # ----- clicks -----
+        "RightSingle": _POSITION_OBJ,
+        "Click": _POSITION_OBJ,
+
+        # ----- drag -----
+        "Drag": {
+            "type": "object",
+            "properties": {"position1": _POSITION, "position2": _POSITION},
+            "required": ["position1", "position2"],
+        },
+
+        # ----- move mouse -----
+        "move_mouse": _POSITION_OBJ,
+
+        # ----- scrolling -----
+        "scroll_up": _SCROLL_OBJ,
+        "scroll_down": _SCROLL_OBJ,
 
-    ACTION_SCHEMA = {
+        # ----- memory + wait -----
+        "record_info": {
+            "type": "object",
+            "properties": {"text": _STRING, "file_name": _STRING},
+            "required": ["text", "file_name"],
+        },
+        "wait": _OPTIONAL_TEXT_OBJ,
+    }
+    return {
         "type": "object",
         "properties": {
             "action": {
                 "type": "array",
                 "minItems": 0,
-                "default": [ { "wait": {} } ], 
+                "default": [{"wait": {}}],
                 "items": {
                     "type": "object",
-                    "properties": {
-                    # ----- task finished -----
-                    "done": {"type": "object",
-                        "properties": {"text": {"type": "string"}}},
-
-                    # ----- typing -----
-                    "input_text": {
-                        "type": "object",
-                        "properties": {"text": {"type": "string"}},
-                        "required": ["text"]
-                    },
-
-                    # ----- open app -----
-                    "open_app": {
-                        "type": "object",
-                        "properties": {"app_name": {"type": "string"}},
-                        "required": ["app_name"]
-                    },
-
-                    # ----- AppleScript -----
-                    "run_apple_script": {
-                        "type": "object",
-                        "properties": {"script": {"type": "string"}},
-                        "required": ["script"]
-                    },
-
-                    # ----- hotkeys -----
-                    "Hotkey": {
-                        "type": "object",
-                        "properties": {"key": {"type": "string"}},
-                        "required": ["key"]
-                    },
-                    "multi_Hotkey": {
-                        "type": "object",
-                        "properties": {
-                            "key1": {"type": "string"},
-                            "key2": {"type": "string"},
-                            "key3": {"type": "string"},
-                        },
-                        "required": ["key1", "key2"]
-                    },
+                    "properties": actions,
+                },
+            },
+        },
+        "required": ["action"],
+    }
 
-                    # ----- clicks -----
-                    "RightSingle": {
-                        "type": "object",
-                        "properties": {
-                            "position": {
-                                "type": "array",
-                                "items": {"type": "number"},
-                            }
-                        },
-                        "required": ["position"]
-                    },
-                    "Click": {
-                        "type": "object",
-                        "properties": {
-                            "position": {"type": "array", "items": {"type": "number"}}
-                        },
-                        "required": ["position"]
-                    },
 
-                    # ----- drag -----
-                    "Drag": {
-                        "type": "object",
-                        "properties": {
-                            "position1": {"type": "array", "items": {"type": "number"}},
-                            "position2": {"type": "array", "items": {"type": "number"}},
-                        },
-                        "required": ["position1", "position2"]
-                    },
+ACTION_SCHEMA = _intern_strings(_build_action_schema())
 
-                    # ----- move mouse -----
-                    "move_mouse": {
-                        "type": "object",
-                        "properties": {
-                            "position": {"type": "array", "items": {"type": "number"}}
-                        },
-                        "required": ["position"]
-                    },
+ACTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "agent_action_output",
+        "strict": True,
+        "schema": ACTION_SCHEMA
+    }
+}
 
-                    # ----- scrolling -----
-                    "scroll_up": {
-                        "type": "object",
-                        "properties": {
-                            "position": {"type": "array", "items": {"type": "number"}},
-                            "dx": {"type": "number"},
-                            "dy": {"type": "number"},
-                        },
-                        "required": ["position"]
-                    },
-                    "scroll_down": {
-                        "type": "object",
-                        "properties": {
-                            "position": {"type": "array", "items": {"type": "number"}},
-                            "dx": {"type": "number"},
-                            "dy": {"type": "number"},
-                        },
-                        "required": ["position"]
+BRAIN_SCHEMA = {
+    "oneOf": [
+        {
+            "type": "object",
+            "properties": {
+                "analysis": {
+                    "type": "object",
+                    "properties": {
+                        "analysis": {"type": "string"},
+                        "sop_check": {"type": "string"}
                     },
-
-                    # ----- memory + wait -----
-                    "record_info": {"type": "object",
-                        "properties": {
-                            "text": {"type": "string"},
-                            "file_name": {"type": "string"}
-                        },
-                        "required": ["text", "file_name"]
-                        },
-                    "wait": {"type": "object",
-                        "properties": {"text": {"type": "string"}}},
+                    "required": ["analysis", "sop_check"]
                 },
-
-                    }
+                "current_state": {
+                    "type": "object",
+                    "properties": {
+                        "step_evaluate": {"type": "string"},
+                        "ask_human": {"type": "string"},
+                        "next_goal": {"type": "string"},
+                    },
+                    "required": [
+                        "step_evaluate",
+                        "ask_human",
+                        "next_goal"
+                    ]
                 },
-
+            },
+            "required": ["analysis", "current_state"],
+            "additionalProperties": False
         },
-        "required": [
-            "action"
-        ]
+        {
+            "type": "object",
+            "properties": {
+                "read_files": {
+                    "type": "object",
+                    "properties": {
+                        "files": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "minItems": 1
+                        }
+                    },
+                    "required": ["files"]
+                }
+            },
+            "required": ["read_files"],
+            "additionalProperties": False
+        }
+    ]
+}
+BRAIN_SCHEMA = _intern_strings(BRAIN_SCHEMA)
+
+BRAIN_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "agent_state_output",
+        "strict": True,
+        "schema": BRAIN_SCHEMA
     }
+}
 
-    ACTION_RESPONSE_FORMAT = {
-        "type": "json_schema",
-        "json_schema": {
-            "name": "agent_action_output",
-            "strict": True,
-            "schema": ACTION_SCHEMA
-        }
+MEMORY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "file_name": {"type": "string"}
+    },
+    "required": ["summary", "file_name"]
+}
+MEMORY_SCHEMA = _intern_strings(MEMORY_SCHEMA)
+
+MEMORY_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "memory_output",
+        "strict": True,
+        "schema": MEMORY_SCHEMA
     }
+}
 
-    BRAIN_SCHEMA = {
-        "oneOf": [
-            {
+PLANNER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "iteration_info": {
+            "type": "object",
+            "properties": {
+                "current_iteration": {"type": "integer", "minimum": 1},
+                "total_iterations": {"type": "integer", "minimum": 1}
+            },
+            "required": ["current_iteration", "total_iterations"],
+            "additionalProperties": False
+        },
+        "search_summary": {"type": "string"},
+        "selected_skills": {
+            "type": "array",
+            "items": {"type": "string"},
+            "default": []
+        },
+        "natural_language_plan": {
+            "type": "string"
+        },
+        "step_by_step_plan": {
+            "type": "array",
+            "items": {
                 "type": "object",
                 "properties": {
-                    "analysis": {
-                        "type": "object",
-                        "properties": {
-                            "analysis": {"type": "string"},
-                            "sop_check": {"type": "string"}
-                        },
-                        "required": ["analysis", "sop_check"]
+                    "step_id": {
+                        "type": "string",
+                        "pattern": "^Step \\d+$"
                     },
-                    "current_state": {
-                        "type": "object",
-                        "properties": {
-                            "step_evaluate": {"type": "string"},
-                            "ask_human": {"type": "string"},
-                            "next_goal": {"type": "string"},
-                        },
-                        "required": [
-                            "step_evaluate",
-                            "ask_human",
-                            "next_goal"
-                        ]
+                    "description": {
+                        "type": "string"
                     },
-                },
-                "required": ["analysis", "current_state"],
-                "additionalProperties": False
-            },
-            {
-                "type": "object",
-                "properties": {
-                    "read_files": {
-                        "type": "object",
-                        "properties": {
-                            "files": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "minItems": 1
-                            }
-                        },
-                        "required": ["files"]
+                    "important_search_info": {
+                        "type": "string"
                     }
                 },
-                "required": ["read_files"],
+                "required": ["step_id", "description", "important_search_info"],
                 "additionalProperties": False
             }
-        ]
-    }
-
-    BRAIN_RESPONSE_FORMAT = {
-        "type": "json_schema",
-        "json_schema": {
-            "name": "agent_state_output",
-            "strict": True,
-            "schema": BRAIN_SCHEMA
         }
-    }
+    },
+    "required": ["iteration_info", "search_summary", "selected_skills", "step_by_step_plan"],
+    "additionalProperties": False
+}
+PLANNER_SCHEMA = _intern_strings(PLANNER_SCHEMA)
 
-    MEMORY_SCHEMA = {
-        "type": "object",
-        "properties": {
-            "summary": {"type": "string"},
-            "file_name": {"type": "string"}
-        },
-        "required": ["summary", "file_name"]
+PLANNER_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "planner_output",
+        "strict": True,
+        "schema": PLANNER_SCHEMA
     }
+}
 
-    MEMORY_RESPONSE_FORMAT = {
-        "type": "json_schema",
-        "json_schema": {
-            "name": "memory_output",
-            "strict": True,
-            "schema": MEMORY_SCHEMA
-        }
-    }
+# Validators precompiled once at import when fastjsonschema is installed;
+# each is a schema-specialized callable, orders of magnitude faster than an
+# interpreting jsonschema walk. None when the optional dependency is absent.
+if fastjsonschema is not None:
+    ACTION_VALIDATOR = fastjsonschema.compile(ACTION_SCHEMA)
+    BRAIN_VALIDATOR = fastjsonschema.compile(BRAIN_SCHEMA)
+    MEMORY_VALIDATOR = fastjsonschema.compile(MEMORY_SCHEMA)
+    PLANNER_VALIDATOR = fastjsonschema.compile(PLANNER_SCHEMA)
+else:
+    ACTION_VALIDATOR = None
+    BRAIN_VALIDATOR = None
+    MEMORY_VALIDATOR = None
+    PLANNER_VALIDATOR = None
 
-    PLANNER_SCHEMA = {
-        "type": "object",
-        "properties": {
-            "iteration_info": {
-                "type": "object",
-                "properties": {
-                    "current_iteration": {"type": "integer", "minimum": 1},
-                    "total_iterations": {"type": "integer", "minimum": 1}
-                },
-                "required": ["current_iteration", "total_iterations"],
-                "additionalProperties": False
-            },
-            "search_summary": {"type": "string"},
-            "selected_skills": {
-                "type": "array",
-                "items": {"type": "string"},
-                "default": []
-            },
-            "natural_language_plan": {
-                "type": "string"
-            },
-            "step_by_step_plan": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "step_id": {
-                            "type": "string",
-                            "pattern": "^Step \\d+$"
-                        },
-                        "description": {
-                            "type": "string"
-                        },
-                        "important_search_info": {
-                            "type": "string"
-                        }
-                    },
-                    "required": ["step_id", "description", "important_search_info"],
-                    "additionalProperties": False
-                }
-            }
-        },
-        "required": ["iteration_info", "search_summary", "selected_skills", "step_by_step_plan"],
-        "additionalProperties": False
-    }
 
-    PLANNER_RESPONSE_FORMAT = {
-        "type": "json_schema",
-        "json_schema": {
-            "name": "planner_output",
-            "strict": True,
-            "schema": PLANNER_SCHEMA
-        }
-    }
+class OutputSchemas:
+    """
+    Thin namespace over the module-level schema constants, kept for backward
+    compatibility. The schemas are treated as read-only by all consumers; they
+    stay plain dicts because the response formats are embedded in outbound
+    request bodies that must remain JSON-serializable.
+    """
+
+    ACTION_SCHEMA = ACTION_SCHEMA
+    BRAIN_SCHEMA = BRAIN_SCHEMA
+    MEMORY_SCHEMA = MEMORY_SCHEMA
+    PLANNER_SCHEMA = PLANNER_SCHEMA
+    ACTION_RESPONSE_FORMAT = ACTION_RESPONSE_FORMAT
+    BRAIN_RESPONSE_FORMAT = BRAIN_RESPONSE_FORMAT
+    MEMORY_RESPONSE_FORMAT = MEMORY_RESPONSE_FORMAT
+    PLANNER_RESPONSE_FORMAT = PLANNER_RESPONSE_FORMAT
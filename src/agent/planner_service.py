@@ -1,9 +1,12 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+import hashlib
 import json
 import logging
 import os
 import re
+import threading
 from typing import Any, List, Optional
 
 from pydantic import BaseModel
@@ -12,6 +15,7 @@ from dotenv import load_dotenv
 from langchain_core.messages import BaseMessage
 
 from src.agent.message_manager.service import MessageManager
+from src.agent.output_schemas import loads as json_loads
 from src.agent.prompts import PlannerPrompt, PlannerPreplanPrompt, PlannerPlanMessageBuilder
 from src.controller.service import Controller
 from src.utils.skills import SkillMetadata, load_skill_contents, format_skill_context
@@ -28,15 +32,42 @@ except ImportError:
         DDGS = None
         DDGSException = Exception  # type: ignore
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
 load_dotenv()
 logger = logging.getLogger(__name__)
+# Case-insensitive refusal check without uppercasing the whole (multi-KB) reply.
+_REFUSE_RE = re.compile(r"REFUSE TO MAKE PLAN", re.IGNORECASE)
 # Silence noisy logs from ddgs/primp to keep planner output clean.
 logging.getLogger("primp").setLevel(logging.WARNING)
 logging.getLogger("primp").propagate = False
 logging.getLogger("ddgs").setLevel(logging.WARNING)
 
+# Bounded pool for blocking DDGS calls, kept separate from asyncio's default
+# executor so slow searches cannot starve other run_in_executor users. Each
+# worker thread reuses one long-lived DDGS session (stashed in thread-local
+# storage) instead of paying HTTP-client construction per query.
+_DDG_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ddg")
+_DDG_TLS = threading.local()
+# Separate pool for backend-variant fallbacks so a _DDG_EXECUTOR worker never
+# blocks waiting on tasks queued behind itself in the same pool.
+_DDG_VARIANT_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ddg-variant")
+
+# Process-wide search-context cache keyed by task digest, with single-flight
+# coalescing: concurrent planners for the same task share one fetch, and
+# later instances (retries, continue_edit_task flows) skip search I/O.
+_SEARCH_CACHE: dict = {}
+_SEARCH_INFLIGHT: dict = {}
+
+# Typed C-level decoder for the common preplan reply shape (a bare JSON array
+# of query strings): parses and type-checks in one pass. None without msgspec.
+_QUERY_DECODER = msgspec.json.Decoder(List[str]) if msgspec is not None else None
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PreplanDecision:
     use_search: bool
     queries: List[str]
@@ -61,6 +92,12 @@ class Planner:
                  ):
         self.planner_llm = planner_llm
         self.controller = Controller()
+        self._prompt_description = self.controller.registry.get_prompt_description()
+        self._prompt_builder = PlannerPlanMessageBuilder(
+            self._prompt_description,
+            skill_catalog=skill_catalog,
+            use_skills=use_skills,
+        )
         self.task = task
         self.max_input_tokens = max_input_tokens
         self.plan_list = []
@@ -79,7 +116,7 @@ class Planner:
         self.message_manager = MessageManager(
             llm=self.planner_llm,
             task=self.task,
-            action_descriptions=self.controller.registry.get_prompt_description(),
+            action_descriptions=self._prompt_description,
             system_prompt_class=PlannerPrompt,
             max_input_tokens=self.max_input_tokens,
         )
@@ -218,12 +255,32 @@ class Planner:
                 seen.add(item)
         return deduped
 
+    def _dedupe_queries(self, queries: List[str]) -> List[str]:
+        """
+        Drop near-duplicate queries, not just identical strings.
+
+        Each query is fingerprinted as the set of its lowercased tokens; a
+        query is dropped when its Jaccard similarity with any kept fingerprint
+        exceeds 0.7. Every discarded query saves a full search round-trip.
+        """
+        fingerprints: List[frozenset] = []
+        deduped = []
+        for q in queries:
+            fp = frozenset(q.lower().split())
+            if not fp:
+                continue
+            if any(len(fp & kept) / len(fp | kept) > 0.7 for kept in fingerprints):
+                continue
+            fingerprints.append(fp)
+            deduped.append(q)
+        return deduped
+
     def _safe_json_loads(self, text: str) -> Optional[Any]:
         cleaned = self._coerce_json_text(text)
         if not cleaned:
             return None
         try:
-            return json.loads(cleaned)
+            return json_loads(cleaned)
         except Exception:
             return None
 
@@ -242,7 +299,15 @@ class Planner:
         return selected
 
     def _parse_preplan_response(self, text: str) -> PreplanDecision:
-        data = self._safe_json_loads(text)
+        data = None
+        cleaned = (text or "").strip()
+        if _QUERY_DECODER is not None and cleaned.startswith("["):
+            try:
+                data = _QUERY_DECODER.decode(cleaned)
+            except msgspec.DecodeError:
+                data = None
+        if data is None:
+            data = self._safe_json_loads(text)
         raw_use_search = None
         raw_queries: List[str] = []
         raw_selected: List[str] = []
@@ -266,7 +331,7 @@ class Planner:
             raw_queries = self._parse_query_lines(text)
 
         queries = [q.strip() for q in raw_queries if isinstance(q, str) and q.strip()]
-        queries = self._dedupe_list(queries)
+        queries = self._dedupe_queries(queries)
 
         use_search = False
         if self.use_search:
@@ -371,21 +436,44 @@ class Planner:
 
         loop = asyncio.get_running_loop()
 
+        def _try_variant(q: str, backend: str) -> List[dict]:
+            ddgs = getattr(_DDG_TLS, "ddgs", None)
+            if ddgs is None:
+                ddgs = DDGS()
+                _DDG_TLS.ddgs = ddgs
+            return list(ddgs.text(q, backend=backend, max_results=max_results))
+
         def _search():
             try:
-                with DDGS() as ddgs:
-                    for q, backend in self._build_query_variants(query):
+                variants = self._build_query_variants(query)
+                if not variants:
+                    return []
+                # The variants are independent fallbacks; race them and take
+                # the first non-empty result instead of paying each failed
+                # backend's round-trip before trying the next.
+                futures = {
+                    _DDG_VARIANT_EXECUTOR.submit(_try_variant, q, backend): (q, backend)
+                    for q, backend in variants
+                }
+                try:
+                    for future in as_completed(futures):
+                        q, backend = futures[future]
                         try:
-                            results = list(ddgs.text(q, backend=backend, max_results=max_results))
-                            if results:
-                                logger.info("Planner search success (backend=%s, query=%r): %d results", backend, q, len(results))
-                                return results
-                            logger.info("Planner search empty (backend=%s, query=%r)", backend, q)
+                            results = future.result()
                         except DDGSException as exc:
                             logger.info("DuckDuckGo search (%s backend) returned no results: %s", backend, exc)
+                            continue
                         except Exception as exc:
                             logger.debug("DuckDuckGo search (%s backend) error: %s", backend, exc, exc_info=True)
+                            continue
+                        if results:
+                            logger.info("Planner search success (backend=%s, query=%r): %d results", backend, q, len(results))
+                            return results
+                        logger.info("Planner search empty (backend=%s, query=%r)", backend, q)
                     return []
+                finally:
+                    for future in futures:
+                        future.cancel()
             except DDGSException as exc:
                 logger.debug("DuckDuckGo search returned no results: %s", exc)
                 return []
@@ -394,86 +482,158 @@ class Planner:
                 return []
 
         try:
-            return await loop.run_in_executor(None, _search)
+            return await loop.run_in_executor(_DDG_EXECUTOR, _search)
         except Exception as exc:
             logger.warning("DuckDuckGo search failed for query %s: %s", query, exc, exc_info=True)
             return []
 
-    def _format_search_results(self, results: List[dict]) -> str:
+    def _format_search_results(self, results: List[dict], include_display: bool = True) -> tuple:
         """
         Convert search results into a compact, readable text block.
+
+        Returns both the display block (with sources) and the pre-stripped
+        summary lines, built in a single pass over the results instead of
+        formatting sources in just to strip them back out. The display block
+        exists only for logging, so callers can skip it with
+        ``include_display=False`` when the log line would be discarded.
         """
-        lines = []
+        display_lines = []
+        stripped_lines = []
         for idx, item in enumerate(results, start=1):
             title = (item.get("title") or "No title").strip()
             snippet = (item.get("body") or "").strip().replace("\n", " ")
-            href = (item.get("href") or "").strip()
             if len(snippet) > 200:
                 snippet = snippet[:197] + "..."
 
             readable = f"{idx}. {title}"
             if snippet:
                 readable += f" — {snippet}"
-            if href:
-                readable += f" (source: {href})"
-            lines.append(readable)
+            stripped_lines.append(readable.rstrip(" -—·."))
+            if include_display:
+                href = (item.get("href") or "").strip()
+                if href:
+                    readable += f" (source: {href})"
+                display_lines.append(readable)
 
-        return "\n".join(lines)
-
-    def _strip_source(self, line: str) -> str:
-        """
-        Remove source links/URLs from a summary line.
-        """
-        if "(source:" in line:
-            line = line.split("(source:", 1)[0].rstrip()
-        return line.rstrip(" -—·.")
+        return "\n".join(display_lines), stripped_lines
 
     async def _get_search_context(self) -> str:
         """
-        Run DuckDuckGo search once per planner instance and cache a readable summary.
+        Run DuckDuckGo search once per task and cache a readable summary.
+
+        The summary is cached per instance and in a process-wide table keyed by
+        a digest of the task, with single-flight coalescing so concurrent
+        planners for the same task share one fetch.
         """
         if self._search_context is not None:
             return self._search_context
         if not self.use_search:
             self._search_context = ""
             return self._search_context
-        self._search_context = ""
+
+        key = hashlib.blake2b(self.task.encode(), digest_size=16).hexdigest()
+        cached = _SEARCH_CACHE.get(key)
+        if cached is not None:
+            self._search_context = cached
+            return cached
+        inflight = _SEARCH_INFLIGHT.get(key)
+        if inflight is not None:
+            self._search_context = await asyncio.shield(inflight)
+            return self._search_context
+
+        future = asyncio.get_running_loop().create_future()
+        _SEARCH_INFLIGHT[key] = future
+        try:
+            context = await self._build_search_context()
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved for waiter-less runs
+            raise
+        else:
+            future.set_result(context)
+            _SEARCH_CACHE[key] = context
+        finally:
+            _SEARCH_INFLIGHT.pop(key, None)
+
+        self._search_context = context
+        return context
+
+    async def _build_search_context(self) -> str:
+        """
+        Generate queries, run the searches, and fold results into a summary.
+        """
+        # Speculatively search for the raw task while the query-generation
+        # step runs, hiding its latency behind the network round-trip. The
+        # prefetch is reused when one of the generated queries turns out to be
+        # a near-duplicate of the task, and discarded otherwise. It only fires
+        # once a preplan has already affirmed search: the raw task can carry
+        # sensitive user detail and must never reach the search backend on
+        # runs where the decision would come back use_search=False.
+        spec_query = " ".join(self.task.split())
+        spec_task = None
+        decision = self._preplan_decision
+        if (DDGS is not None and spec_query
+                and decision is not None and decision.use_search):
+            spec_task = asyncio.create_task(self._fetch_search_results(spec_query, max_results=8))
 
         queries = await self._decide_search_queries()
         if not queries:
+            if spec_task is not None:
+                spec_task.cancel()
             logger.info("Planner search skipped; no queries provided.")
-            return self._search_context
+            return ""
         logger.info("Planner will try search queries: %s", queries)
 
         summary_lines: List[str] = []
         max_queries_to_use = 3
         max_summary_lines = 8
 
-        for q in queries:
-            results = await self._fetch_search_results(q, max_results=8)
+        # Fetch all queries concurrently; each is an independent network
+        # round-trip, so wall-clock drops from the sum to the slowest one.
+        active_queries = queries[:max_queries_to_use]
+        spec_fp = frozenset(spec_query.lower().split())
+
+        def _matches_prefetch(q: str) -> bool:
+            fp = frozenset(q.lower().split())
+            union = fp | spec_fp
+            return bool(union) and len(fp & spec_fp) / len(union) > 0.7
+
+        fetches = []
+        spec_used = False
+        for q in active_queries:
+            if spec_task is not None and not spec_used and _matches_prefetch(q):
+                fetches.append(spec_task)
+                spec_used = True
+            else:
+                fetches.append(self._fetch_search_results(q, max_results=8))
+        if spec_task is not None and not spec_used:
+            spec_task.cancel()
+        all_results = await asyncio.gather(*fetches, return_exceptions=True)
+        info_enabled = logger.isEnabledFor(logging.INFO)
+        for q, results in zip(active_queries, all_results):
+            if isinstance(results, BaseException):
+                logger.debug("Planner search failed for query=%r: %s", q, results)
+                continue
             if results:
-                formatted = self._format_search_results(results)
-                logger.info("Planner search results for query=%r:\n%s", q, formatted)
+                # Only build the multi-KB display block when INFO will be emitted.
+                formatted, stripped_lines = self._format_search_results(results, include_display=info_enabled)
+                if info_enabled:
+                    logger.info("Planner search results for query=%r:\n%s", q, formatted)
                 # Collect up to two concise lines per query for a compact summary without sources
-                for idx, line in enumerate(formatted.splitlines()):
-                    if idx >= 2:
-                        break
-                    clean_line = self._strip_source(line)
+                for clean_line in stripped_lines[:2]:
                     summary_lines.append(f"{q[:50]}... -> {clean_line}")
                     if len(summary_lines) >= max_summary_lines:
                         break
-                if len(summary_lines) >= max_summary_lines or len(summary_lines) >= max_queries_to_use * 2:
+                if len(summary_lines) >= max_summary_lines:
                     break
             else:
                 logger.info("Planner search produced no results for query=%r", q)
 
         if summary_lines:
-            self._search_context = "Concise search summary (links removed):\n" + "\n".join(summary_lines)
             logger.info("Planner aggregated concise search summary from %d lines.", len(summary_lines))
-        else:
-            logger.info("Planner search produced no usable results; proceeding without external context.")
-
-        return self._search_context
+            return "Concise search summary (links removed):\n" + "\n".join(summary_lines)
+        logger.info("Planner search produced no usable results; proceeding without external context.")
+        return ""
 
     async def _get_skill_context(self) -> str:
         """
@@ -508,17 +668,11 @@ class Planner:
     async def edit_task(self) -> "PlannerResult":
         if not self.planner_llm:
             return
-        controller = Controller()
-        prompt_builder = PlannerPlanMessageBuilder(
-            controller.registry.get_prompt_description(),
-            skill_catalog=self.skill_catalog,
-            use_skills=self.use_skills,
-        )
         preplan = await self._ensure_preplan_decision()
         search_context = await self._get_search_context()
         skill_context = await self._get_skill_context()
         selected_skills = preplan.selected_skills if preplan else []
-        messages = prompt_builder.build_initial_messages(
+        messages = self._prompt_builder.build_initial_messages(
             task=self.task,
             search_context=search_context,
             selected_skills=selected_skills,
@@ -529,8 +683,7 @@ class Planner:
         if isinstance(result.payload, dict):
             result.payload["selected_skills"] = selected_skills
         reply_text = (result.raw_text or "").strip()
-        reply_norm = reply_text.upper()
-        if "REFUSE TO MAKE PLAN" in reply_norm:
+        if _REFUSE_RE.search(reply_text):
             logging.error("Planner refused. Aborting.")
             raise SystemExit(1)
         self._save_planner_conversation(messages, result.raw_text, "initial")
@@ -539,17 +692,11 @@ class Planner:
     async def continue_edit_task(self, info_memory, task_summary) -> "PlannerResult":
         if not self.planner_llm:
             return
-        controller = Controller()
-        prompt_builder = PlannerPlanMessageBuilder(
-            controller.registry.get_prompt_description(),
-            skill_catalog=self.skill_catalog,
-            use_skills=self.use_skills,
-        )
         preplan = await self._ensure_preplan_decision()
         search_context = await self._get_search_context()
         skill_context = await self._get_skill_context()
         selected_skills = preplan.selected_skills if preplan else []
-        messages = prompt_builder.build_continue_messages(
+        messages = self._prompt_builder.build_continue_messages(
             task=self.task,
             info_memory=info_memory,
             task_summary=task_summary,
@@ -563,15 +710,14 @@ class Planner:
         if isinstance(result.payload, dict):
             result.payload["selected_skills"] = selected_skills
         reply_text = (result.raw_text or "").strip()
-        reply_norm = reply_text.upper()
-        if "REFUSE TO MAKE PLAN" in reply_norm:
+        if _REFUSE_RE.search(reply_text):
             logging.error("Planner refused. Aborting.")
             raise SystemExit(1)
         self._save_planner_conversation(messages, result.raw_text, "continue")
         return result
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlannerResult:
     raw_text: str
     payload: Optional[dict]
@@ -358,10 +358,29 @@ class PlannerPlanMessageBuilder:
         self.action_descriptions = action_descriptions
         self.skill_catalog = skill_catalog
         self.use_skills = use_skills
+        # The system message is deterministic for a fixed registry/catalog, so
+        # render it once instead of re-templating it on every planner call.
+        self._system_message = PlannerPrompt(
+            action_descriptions,
+            skill_catalog=skill_catalog,
+        ).get_system_message()
+        # Fixed template pieces around the per-call task text, precomputed so
+        # build_initial_messages only joins instead of re-interpolating the
+        # multi-KB system message each call.
+        self._initial_prefix = f"{self._system_message.content}\n"
+        self._initial_task_header = 'Now, here is the task you need to break down:\n"'
+        self._initial_suffix = '"\nPlease follow the guidelines and provide the required JSON output.'
+        # One-entry memo for the rendered search blocks; the search context is
+        # computed once per planner, so continuation iterations reuse the same
+        # strings instead of re-formatting them each call.
+        self._search_blocks_cache: tuple[str, tuple[str, str]] | None = None
 
     def _search_blocks(self, search_context: str) -> tuple[str, str]:
         if not search_context:
             return "", ""
+        cached = self._search_blocks_cache
+        if cached is not None and cached[0] == search_context:
+            return cached[1]
         search_block = (
             "Readable DuckDuckGo findings selected by planner (summary only):\n"
             f"{search_context}\n\n"
@@ -371,6 +390,7 @@ class PlannerPlanMessageBuilder:
             "with concise, useful insights that support that step. "
             "Include a short summary of the most relevant search findings for the overall task if helpful.\n"
         )
+        self._search_blocks_cache = (search_context, (search_block, search_guidance))
         return search_block, search_guidance
 
     def _skill_blocks(
@@ -398,23 +418,18 @@ class PlannerPlanMessageBuilder:
         selected_skills: list[str],
         skill_context: str,
     ) -> list[BaseMessage]:
-        planner_prompt = PlannerPrompt(
-            self.action_descriptions,
-            skill_catalog=self.skill_catalog,
-        )
-        system_message = planner_prompt.get_system_message().content
         search_block, search_guidance = self._search_blocks(search_context)
         skill_block, skill_guidance = self._skill_blocks(selected_skills, skill_context)
-        content = f"""
-                {system_message}
-                {search_block}
-                {skill_block}
-                {search_guidance}
-                {skill_guidance}
-                Now, here is the task you need to break down:
-                "{task}"
-                Please follow the guidelines and provide the required JSON output.
-                """
+        content = "".join((
+            self._initial_prefix,
+            search_block,
+            skill_block,
+            search_guidance,
+            skill_guidance,
+            self._initial_task_header,
+            task,
+            self._initial_suffix,
+        ))
         return [HumanMessage(content=content)]
 
     def build_continue_messages(
@@ -427,24 +442,18 @@ class PlannerPlanMessageBuilder:
         selected_skills: list[str],
         skill_context: str,
     ) -> list[BaseMessage]:
-        planner_prompt = PlannerPrompt(
-            self.action_descriptions,
-            skill_catalog=self.skill_catalog,
-        )
         search_block, search_guidance = self._search_blocks(search_context)
         skill_block, skill_guidance = self._skill_blocks(selected_skills, skill_context)
-        content = f"The summary of previous tasks are as follows: {task_summary}\n\n"
-        content += f"The information memory for previous tasks are as follows: {info_memory}\n\n"
-        content += f"The previous task you planned and being completed is as follows: '{plan_list}'.\n\n"
-        content += search_block
-        content += skill_block
-        if search_guidance:
-            content += search_guidance
-        if skill_guidance:
-            content += skill_guidance
-        content += (
+        content = "".join((
+            f"The summary of previous tasks are as follows: {task_summary}\n\n",
+            f"The information memory for previous tasks are as follows: {info_memory}\n\n",
+            f"The previous task you planned and being completed is as follows: '{plan_list}'.\n\n",
+            search_block,
+            skill_block,
+            search_guidance,
+            skill_guidance,
             "Based on the above information memory and task summaries, please continue to edit and "
             f"provide a detailed step-by-step plan for the overall task: '{task}'. Ensure that the plan "
-            "is clear, actionable, avoid the previous plan you generated, and follows the required format."
-        )
-        return [planner_prompt.get_system_message(), HumanMessage(content=content)]
+            "is clear, actionable, avoid the previous plan you generated, and follows the required format.",
+        ))
+        return [self._system_message, HumanMessage(content=content)]
@@ -57,7 +57,7 @@ from src.controller.service import Controller
 from src.mac.tree import MacUITreeBuilder
 from src.utils import time_execution_async
 from src.utils.token_counter import TokenCounter
-from src.agent.output_schemas import OutputSchemas
+from src.agent.output_schemas import ACTION_VALIDATOR, OutputSchemas, loads as json_loads
 from src.agent.structured_llm import *
 
 load_dotenv()
@@ -502,7 +502,7 @@ class Agent:
         cleaned_memory_response = re.sub(r"^```(json)?", "", memory_text.strip())
         cleaned_memory_response = re.sub(r"```$", "", cleaned_memory_response).strip()
         logger.debug(f"[Memory] Raw text: {cleaned_memory_response}")
-        return json.loads(cleaned_memory_response)
+        return json_loads(cleaned_memory_response)
 
     async def _run_memory_summary(self, memory_text: str, context_label: str) -> tuple[str, str]:
         memory_content = [
@@ -1099,7 +1099,12 @@ class Agent:
         logger.debug(f'LLM response: {response}')
         record = str(response.content)
 
-        output_dict = json.loads(record)
+        output_dict = json_loads(record)
+        if ACTION_VALIDATOR is not None:
+            try:
+                ACTION_VALIDATOR(output_dict)
+            except Exception as exc:
+                logger.warning("Actor output failed schema validation: %s", exc)
         normalized_actions = []
         for action in output_dict.get("action", []):
             if not isinstance(action, dict) or not action:
@@ -1,6 +1,8 @@
 from __future__ import annotations
+from functools import cached_property
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
+from src.agent.output_schemas import dumps as _json_dumps
 from src.controller.views import *
 # ---------------------------------------------------------------------------
 # DISCRIMINATED UNION FOR A SINGLE ACTION ITEM
@@ -24,11 +26,30 @@ class ActionItem(BaseModel):
     record_info: Optional[RecordAction] = None
     wait: Optional[NoParamsAction] = None
 
+    @cached_property
+    def active(self) -> tuple:
+        """Return ``(name, params)`` for the single populated action field.
+
+        The wire format keys each action by its name (e.g. ``{"Click": {...}}``)
+        with no embedded type tag, so a pydantic discriminated union cannot
+        apply here. ``model_fields_set`` already records exactly which key the
+        LLM sent, giving O(1) access to the active variant without walking all
+        fourteen optional fields.
+        """
+        for name in self.model_fields_set:
+            value = getattr(self, name)
+            if value is not None:
+                return name, value
+        for name in self.__class__.model_fields:
+            value = getattr(self, name)
+            if value is not None:
+                return name, value
+        return "wait", None
+
     def __repr__(self) -> str:
-        non_none = self.model_dump(exclude_none=True)
-        field_strs = ", ".join(f"{k}={v!r}" for k, v in non_none.items())
-        return f"{self.__class__.__name__}({field_strs})"
-    
+        name, value = self.active
+        return f"{self.__class__.__name__}({name}={value!r})"
+
     @field_validator("wait", mode="before")
     def fix_empty_string(cls, v):
         if v == "" or v is None:
@@ -66,19 +87,20 @@ class MemoryOutput(BaseModel):
         field_strs = ", ".join(f"{k}={v!r}" for k, v in non_none.items())
         return f"{self.__class__.__name__}({field_strs})"
 
-    @property
+    @cached_property
     def content(self) -> str:
         """
         Returns a JSON-formatted string representation of the instance,
-        allowing access via the `.content` attribute.
+        computed on first access and cached (instances are not mutated after
+        validation), allowing access via the `.content` attribute.
         """
-        return self.model_dump_json(exclude_none=True, exclude_unset=True)
+        return _json_dumps(self.model_dump(exclude_none=True, exclude_unset=True))
 
-    @property
+    @cached_property
     def parsed(self) -> Dict[str, Any]:
         """
-        Returns the dictionary representation of the instance,
-        facilitating direct access to structured data.
+        Returns the dictionary representation of the instance, computed once
+        per instance, facilitating direct access to structured data.
         """
         return self.model_dump(exclude_none=True, exclude_unset=True)
 
@@ -95,12 +117,15 @@ class BrainOutput(BaseModel):
 
     @model_validator(mode="after")
     def validate_output(self) -> "BrainOutput":
+        # Bind once; this runs on every BrainOutput construction in the step loop.
+        analysis = self.analysis
+        current_state = self.current_state
         if self.read_files:
-            if self.analysis or self.current_state:
+            if analysis is not None or current_state is not None:
                 raise ValueError("Read-files output must not include analysis or current_state.")
-        else:
-            if not (self.analysis and self.current_state):
-                raise ValueError("analysis and current_state are required when read_files is not requested.")
+            return self
+        if analysis is None or current_state is None:
+            raise ValueError("analysis and current_state are required when read_files is not requested.")
         return self
 
     def __repr__(self) -> str:
@@ -108,19 +133,20 @@ class BrainOutput(BaseModel):
         field_strs = ", ".join(f"{k}={v!r}" for k, v in non_none.items())
         return f"{self.__class__.__name__}({field_strs})"
 
-    @property
+    @cached_property
     def content(self) -> str:
         """
         Returns a JSON-formatted string representation of the instance,
-        allowing access via the `.content` attribute.
+        computed on first access and cached (instances are not mutated after
+        validation), allowing access via the `.content` attribute.
         """
-        return self.model_dump_json(exclude_none=True, exclude_unset=True)
+        return _json_dumps(self.model_dump(exclude_none=True, exclude_unset=True))
 
-    @property
+    @cached_property
     def parsed(self) -> Dict[str, Any]:
         """
-        Returns the dictionary representation of the instance,
-        facilitating direct access to structured data.
+        Returns the dictionary representation of the instance, computed once
+        per instance, facilitating direct access to structured data.
         """
         return self.model_dump(exclude_none=True, exclude_unset=True)
 
@@ -137,19 +163,20 @@ class ActorOutput(BaseModel):
         field_strs = ", ".join(f"{k}={v!r}" for k, v in non_none.items())
         return f"{self.__class__.__name__}({field_strs})"
 
-    @property
+    @cached_property
     def content(self) -> str:
         """
         Returns a JSON-formatted string representation of the instance,
-        allowing access via the `.content` attribute.
+        computed on first access and cached (instances are not mutated after
+        validation), allowing access via the `.content` attribute.
         """
-        return self.model_dump_json(exclude_none=True, exclude_unset=True)
+        return _json_dumps(self.model_dump(exclude_none=True, exclude_unset=True))
 
-    @property
+    @cached_property
     def parsed(self) -> Dict[str, Any]:
         """
-        Returns the dictionary representation of the instance,
-        facilitating direct access to structured data.
+        Returns the dictionary representation of the instance, computed once
+        per instance, facilitating direct access to structured data.
         """
         return self.model_dump(exclude_none=True, exclude_unset=True)
     
@@ -178,20 +205,28 @@ class PlannerOutput(BaseModel):
         description="Ordered high-level plan objects, each must start with 'Step N'."
     )
 
-    @property
+    _STEP_FMT = "{step_id}: {description} (search: {important_search_info})"
+
+    @cached_property
     def content(self) -> str:
-        lines = []
-        if self.search_summary:
-            lines.append(f"Search summary: {self.search_summary}")
-        if self.selected_skills:
-            lines.append(f"Selected skills: {', '.join(self.selected_skills)}")
-        if self.natural_language_plan:
-            lines.append("Plan:")
-            lines.append(self.natural_language_plan)
-        for step in self.step_by_step_plan:
-            info = step.important_search_info or ""
-            lines.append(f"{step.step_id}: {step.description} (search: {info})")
-        return "\n".join(lines)
+        step_fmt = self._STEP_FMT.format_map
+
+        def _iter_lines():
+            if self.search_summary:
+                yield f"Search summary: {self.search_summary}"
+            if self.selected_skills:
+                yield f"Selected skills: {', '.join(self.selected_skills)}"
+            if self.natural_language_plan:
+                yield "Plan:"
+                yield self.natural_language_plan
+            for step in self.step_by_step_plan:
+                yield step_fmt({
+                    "step_id": step.step_id,
+                    "description": step.description,
+                    "important_search_info": step.important_search_info or "",
+                })
+
+        return "\n".join(_iter_lines())
 
 
 __all__ = [
@@ -1,17 +1,19 @@
+import ctypes
+import ctypes.util
 import logging
+import objc
 import Quartz
 import asyncio
 import time
 from Quartz.CoreGraphics import *
-# We keep PyAutoGUI references for keyboard presses/hotkeys if desired,
-# but remove it for mouse actions to avoid moving the cursor visually.
-import pyautogui  
 import Quartz, CoreFoundation as CF
 from ApplicationServices import (
     NSWindow, NSBorderlessWindowMask, NSBackingStoreBuffered,
     NSColor, NSTimer
 )
-from pynput.keyboard import Controller
+from AppKit import NSEvent
+from Foundation import NSOperationQueue
+from pynput.keyboard import Controller, Key
 from typing import Optional
 from src.mac.element import MacElementNode
 
@@ -19,25 +21,85 @@ logger = logging.getLogger(__name__)
 
 kb = Controller()
 
+# Sub-millisecond pacing: asyncio.sleep goes through the selector, whose
+# granularity stretches a 3ms request to 8-16ms. mach_wait_until blocks the
+# loop thread in the kernel at microsecond precision, so it is reserved for
+# the final sub-millisecond residual while the bulk of the delay stays on the
+# loop where other tasks (overlays, stop callbacks) keep running.
+_libsystem = ctypes.CDLL(ctypes.util.find_library("System") or "/usr/lib/libSystem.B.dylib")
+_mach_absolute_time = _libsystem.mach_absolute_time
+_mach_absolute_time.restype = ctypes.c_uint64
+_mach_wait_until = _libsystem.mach_wait_until
+_mach_wait_until.argtypes = [ctypes.c_uint64]
+
+class _MachTimebase(ctypes.Structure):
+    _fields_ = [("numer", ctypes.c_uint32), ("denom", ctypes.c_uint32)]
+
+_mach_timebase = _MachTimebase()
+_libsystem.mach_timebase_info(ctypes.byref(_mach_timebase))
+_NS_TO_MACH = _mach_timebase.denom / _mach_timebase.numer
+
+# Portion of a delay handed to the selector; only the remainder below this is
+# kernel-waited, bounding the loop stall per sleep to ~1ms.
+_RESIDUAL_WAIT_NS = 1_000_000
+
+async def _precise_sleep_ns(delay_ns: int):
+    """Sleep the bulk on the loop, then wait out the residual in the kernel."""
+    deadline = _mach_absolute_time() + int(delay_ns * _NS_TO_MACH)
+    if delay_ns > _RESIDUAL_WAIT_NS:
+        await asyncio.sleep((delay_ns - _RESIDUAL_WAIT_NS) / 1e9)
+    else:
+        await asyncio.sleep(0)
+    _mach_wait_until(deadline)
+
+# Shared HID-state event source: the source object is reusable and safe for
+# posting, so actions skip a CGEventSourceCreate kernel call apiece.
+_EVENT_SOURCE = CGEventSourceCreate(kCGEventSourceStateHIDSystemState)
+# Deliver every dragged event instead of letting the window server coalesce
+# them, and keep our own posts from suppressing the ones that follow; with
+# lossless delivery a drag needs far fewer interpolation points.
+NSEvent.setMouseCoalescingEnabled_(False)
+CGEventSourceSetLocalEventsSuppressionInterval(_EVENT_SOURCE, 0.0)
+
 
 # ------------------------------------------------
 # HELPER FUNCTIONS
 # ------------------------------------------------
 
+# Cached main-display size. The Quartz display queries are IPC round-trips and
+# run on every mouse action; the values only change on display reconfiguration,
+# which empties the cache via the callback registered below.
+_SCREEN_SIZE = [None]
+
 def _get_screen_size():
-    """Return (width, height) of the main display in pixels."""
-    display_id = Quartz.CGMainDisplayID()
-    width = Quartz.CGDisplayPixelsWide(display_id)
-    height = Quartz.CGDisplayPixelsHigh(display_id)
-    return width, height
+    """Return (width, height) of the main display in pixels (cached)."""
+    size = _SCREEN_SIZE[0]
+    if size is None:
+        display_id = Quartz.CGMainDisplayID()
+        size = (Quartz.CGDisplayPixelsWide(display_id), Quartz.CGDisplayPixelsHigh(display_id))
+        _SCREEN_SIZE[0] = size
+    return size
+
+def _display_reconfigured(display, flags, user_info):
+    _SCREEN_SIZE[0] = None
+
+try:
+    Quartz.CGDisplayRegisterReconfigurationCallback(_display_reconfigured, None)
+except Exception:
+    # Without the callback the size is still correct until displays change.
+    logger.debug("Could not register display reconfiguration callback.", exc_info=True)
+
+def _to_abs(position, screen_w, screen_h):
+    """Convert a normalized position (0-1 or 0-1000 scale) to absolute pixels."""
+    factor = 0.001 if position[0] > 1 and position[1] > 1 else 1.0
+    return position[0] * factor * screen_w, position[1] * factor * screen_h
 
 def _get_current_mouse_position():
     """Return the current mouse cursor position as a (x, y) tuple in absolute pixels."""
-    # event = Quartz.CGEventCreate(None)
-    # return Quartz.CGEventGetLocation(event)
-    # Get the curren location with pyautogui
-    pos = pyautogui.position()
-    return (pos[0], pos[1])
+    # A bare CGEvent carries the cursor location; one C call instead of the
+    # AppKit machinery behind pyautogui.position().
+    point = Quartz.CGEventGetLocation(Quartz.CGEventCreate(None))
+    return (point.x, point.y)
 
 def _warp_cursor(position):
     """
@@ -56,117 +118,229 @@ def _post_mouse_event(x, y, event_type, button):
     )
     Quartz.CGEventPost(Quartz.kCGSessionEventTap, event)
 
-async def flash_click_highlight(x, y, radius=16, duration=1.0):
-    screen_width, screen_height = pyautogui.size()
-    y = screen_height - y  # Convert to Quartz's coordinate system
-    """Red ring for <duration>s; returns immediately (no seg-fault)."""
-    # -- create overlay window ------------------------------------------------
+# Pre-built event templates for the fixed-shape actions. CGEventPost copies
+# the event into the kernel, so one template per action can be re-patched with
+# CGEventSetLocation/CGEventSetTimestamp and reposted forever — no
+# CGEventCreate* call on the hot path. Each entry is (tap, events); actions
+# run sequentially in the agent loop, so the shared mutable events are safe.
+def _build_event_templates():
+    src = _EVENT_SOURCE
+    origin = (0, 0)
+    left_down = Quartz.CGEventCreateMouseEvent(
+        src, Quartz.kCGEventLeftMouseDown, origin, Quartz.kCGMouseButtonLeft)
+    left_up = Quartz.CGEventCreateMouseEvent(
+        src, Quartz.kCGEventLeftMouseUp, origin, Quartz.kCGMouseButtonLeft)
+    right_down = Quartz.CGEventCreateMouseEvent(
+        src, Quartz.kCGEventRightMouseDown, origin, Quartz.kCGMouseButtonRight)
+    right_up = Quartz.CGEventCreateMouseEvent(
+        src, Quartz.kCGEventRightMouseUp, origin, Quartz.kCGMouseButtonRight)
+    move = Quartz.CGEventCreateMouseEvent(
+        src, Quartz.kCGEventMouseMoved, origin, Quartz.kCGMouseButtonLeft)
+    scroll_up = Quartz.CGEventCreateScrollWheelEvent(
+        src, Quartz.kCGScrollEventUnitLine, 1, 1)
+    scroll_down = Quartz.CGEventCreateScrollWheelEvent(
+        src, Quartz.kCGScrollEventUnitLine, 1, -1)
+    return {
+        'left_click': (Quartz.kCGHIDEventTap, (left_down, left_up)),
+        'right_click': (Quartz.kCGHIDEventTap, (right_down, right_up)),
+        'move': (Quartz.kCGSessionEventTap, (move,)),
+        'scroll_up': (Quartz.kCGSessionEventTap, (scroll_up,)),
+        'scroll_down': (Quartz.kCGSessionEventTap, (scroll_down,)),
+    }
+
+_EVENT_TEMPLATES = _build_event_templates()
+
+def _dispatch(name, x, y):
+    """Patch the named template's location and timestamp, then post its events.
+
+    All events in the batch share one timestamp and go out back-to-back, so a
+    click is exactly two Mach IPCs with no allocation in between.
+    """
+    tap, events = _EVENT_TEMPLATES[name]
+    ts = int(time.time_ns())
+    for ev in events:
+        Quartz.CGEventSetLocation(ev, (x, y))
+        Quartz.CGEventSetTimestamp(ev, ts)
+        Quartz.CGEventPost(tap, ev)
+
+# Reusable overlay (window, layer) pairs — NSWindow creation is milliseconds
+# of WindowServer IPC, so expired flashes park their window here instead of
+# closing it. Touched from the main queue only.
+_OVERLAY_POOL = []
+_OVERLAY_POOL_MAX = 4
+
+# Constant overlay attributes, resolved once instead of per flash.
+_RED_CGCOLOR = Quartz.CGColorCreateGenericRGB(1, 0, 0, 1)
+_CLEAR_NSCOLOR = NSColor.clearColor()
+_OVERLAY_LEVEL = Quartz.kCGOverlayWindowLevel
+
+def _acquire_flash_overlay(x, y, radius):
+    """Show a red-ring overlay at (x, y), reusing a pooled window if one is free.
+
+    Must run on the main thread.
+    """
     frame = Quartz.CGRectMake(x - radius, y - radius, radius*2, radius*2)
-    win   = NSWindow.alloc().initWithContentRect_styleMask_backing_defer_(
+    if _OVERLAY_POOL:
+        win, layer = _OVERLAY_POOL.pop()
+        win.setFrame_display_(frame, False)
+        layer.setFrame_(win.contentView().bounds())
+        layer.setCornerRadius_(radius)
+        win.orderFrontRegardless()
+        return win, layer
+
+    win = NSWindow.alloc().initWithContentRect_styleMask_backing_defer_(
               frame, NSBorderlessWindowMask, NSBackingStoreBuffered, False)
-    win.setLevel_(Quartz.kCGOverlayWindowLevel)
+    win.setLevel_(_OVERLAY_LEVEL)
     win.setOpaque_(False)
-    win.setBackgroundColor_(NSColor.clearColor())
+    win.setBackgroundColor_(_CLEAR_NSCOLOR)
     win.setIgnoresMouseEvents_(True)
+    win.setReleasedWhenClosed_(False)
     win.contentView().setWantsLayer_(True)
 
     layer = Quartz.CALayer.layer()
     layer.setFrame_(win.contentView().bounds())
     layer.setCornerRadius_(radius)
     layer.setBorderWidth_(2)
-    layer.setBorderColor_(Quartz.CGColorCreateGenericRGB(1, 0, 0, 1))
+    layer.setBorderColor_(_RED_CGCOLOR)
     win.contentView().layer().addSublayer_(layer)
     win.orderFrontRegardless()
+    return win, layer
+
+def _release_flash_overlay(win, layer):
+    """Hide an overlay and return it to the pool (or close it if full)."""
+    win.orderOut_(None)
+    if len(_OVERLAY_POOL) < _OVERLAY_POOL_MAX:
+        _OVERLAY_POOL.append((win, layer))
+    else:
+        win.close()
+
+def _pump_main_run_loop():
+    """Drain pending main-queue blocks.
+
+    asyncio.run() owns the main thread, so nothing pumps the run loop for
+    NSOperationQueue.mainQueue() on its own; without this one-pass pump the
+    queued overlay blocks would sit unexecuted forever. Must be called from
+    the main thread (which is where the asyncio loop runs).
+    """
+    CF.CFRunLoopRunInMode(CF.kCFRunLoopDefaultMode, 0, False)
+
+async def flash_click_highlight(x, y, radius=16, duration=1.0):
+    """Red ring for <duration>s; AppKit work runs on the main queue."""
+    screen_width, screen_height = _get_screen_size()
+    y = screen_height - y  # Convert to Quartz's coordinate system
+
+    # Window creation is milliseconds of AppKit/WindowServer work and must be
+    # on the main thread anyway; queue it there so this coroutine (and the
+    # click that spawned it) is never held up by UI feedback.
+    holder = []
+    NSOperationQueue.mainQueue().addOperationWithBlock_(
+        lambda: holder.append(_acquire_flash_overlay(x, y, radius)))
+    _pump_main_run_loop()
+
+    await asyncio.sleep(duration)
 
-    # -- schedule dismissal ---------------------------------------------------
-    NSTimer.scheduledTimerWithTimeInterval_target_selector_userInfo_repeats_(
-        duration,      win, "orderOut:", None, False)
-    NSTimer.scheduledTimerWithTimeInterval_target_selector_userInfo_repeats_(
-        duration + .05, win, "close",     None, False)
+    def _dismiss():
+        if holder:
+            _release_flash_overlay(*holder[0])
 
-    # -- pulse Cocoa’s run-loop just long enough for the timer to fire --------
-    CF.CFRunLoopRunInMode(Quartz.kCFRunLoopDefaultMode, duration + .1, False)
+    NSOperationQueue.mainQueue().addOperationWithBlock_(_dismiss)
+    _pump_main_run_loop()
 
-async def _click_invisible(x, y, button='left'):
+async def _click_invisible(x, y, button='left', settle_ms=0):
     """
     Perform a press-and-release click at (x, y) without leaving
     the cursor there. The pointer returns to its old position.
-    `button` can be 'left' or 'right'.
+    `button` can be 'left' or 'right'. `settle_ms` optionally posts a
+    hover move and waits before pressing, for targets that need it.
     """
     # Create a async thread to run the flash highlight
     asyncio.create_task(flash_click_highlight(x, y))
 
-    if button == 'left':
-        down_type = Quartz.kCGEventLeftMouseDown
-        up_type   = Quartz.kCGEventLeftMouseUp
-        cg_button = Quartz.kCGMouseButtonLeft
-    else:
-        down_type = Quartz.kCGEventRightMouseDown
-        up_type   = Quartz.kCGEventRightMouseUp
-        cg_button = Quartz.kCGMouseButtonRight
-
-    old_pos = _get_current_mouse_position()  # Save where the user cursor was
-    # try:
-    # Press down
-    move = Quartz.CGEventCreateMouseEvent(None,
-                                      Quartz.kCGEventMouseMoved,
-                                      (x, y), cg_button)
-    Quartz.CGEventPost(Quartz.kCGSessionEventTap, move)
-    
-    await asyncio.sleep(0.03)
-    event_down = Quartz.CGEventCreateMouseEvent(None, down_type, (x, y), cg_button)
-    Quartz.CGEventPost(Quartz.kCGHIDEventTap, event_down)
-    
-    # Release
-    event_up = Quartz.CGEventCreateMouseEvent(None, up_type, (x, y), cg_button)
-    Quartz.CGEventPost(Quartz.kCGHIDEventTap, event_up)
-    
-async def _drag_invisible(x1, y1, x2, y2, duration=0.5, steps=60, button='left'):
-    src = CGEventSourceCreate(kCGEventSourceStateHIDSystemState)
-
-    down = CGEventCreateMouseEvent(src,
-                                   kCGEventLeftMouseDown,
-                                   (x1, y1),
-                                   kCGMouseButtonLeft)
-    CGEventSetIntegerValueField(down,
-                                kCGMouseEventClickState, 1)
-    CGEventPost(kCGHIDEventTap, down)
-
-    step_t = duration/steps
-    for i in range(1, steps+1):
-        nx = x1 + (x2-x1)*i/steps
-        ny = y1 + (y2-y1)*i/steps
+    template = 'left_click' if button == 'left' else 'right_click'
+
+    # Drain the events' autoreleased wrappers when the click finishes instead
+    # of letting them pile up for the lifetime of the agent loop.
+    with objc.autorelease_pool():
+        # The down event carries the target coordinate itself, so the
+        # preparatory hover move (and its settle delay) is opt-in only.
+        # Note: a few apps treat a zero-duration press as a hover; give those
+        # a settle_ms of at least 1 rather than re-spacing the events here.
+        if settle_ms:
+            _dispatch('move', x, y)
+
+            # Schedule the press via call_later and await its completion
+            # future; the loop stays free for other actions during the
+            # settle and the press fires on time even under task pressure.
+            loop = asyncio.get_running_loop()
+            posted = loop.create_future()
+
+            def _post_down_up():
+                _dispatch(template, x, y)
+                posted.set_result(None)
+
+            loop.call_later(settle_ms / 1000, _post_down_up)
+            await posted
+        else:
+            _dispatch(template, x, y)
+
+async def _drag_invisible(x1, y1, x2, y2, duration=0.2, steps=20, button='left'):
+    with objc.autorelease_pool():
+        src = _EVENT_SOURCE
+
+        down = CGEventCreateMouseEvent(src,
+                                       kCGEventLeftMouseDown,
+                                       (x1, y1),
+                                       kCGMouseButtonLeft)
+        CGEventSetIntegerValueField(down,
+                                    kCGMouseEventClickState, 1)
+        CGEventPost(kCGHIDEventTap, down)
+
+        step_t = duration/steps
+        # One pooled drag event, mutated per step: location and timestamp change
+        # between posts, so there is no need for a fresh CFTypeRef per point.
         drag = CGEventCreateMouseEvent(src,
                                        kCGEventLeftMouseDragged,
-                                       (nx, ny),
+                                       (x1, y1),
                                        kCGMouseButtonLeft)
         CGEventSetIntegerValueField(drag,
                                     kCGMouseEventClickState, 1)
-        CGEventSetTimestamp(drag, int(time.time_ns()))   # 15+ 必填
-        CGEventPost(kCGHIDEventTap, drag)
-        await asyncio.sleep(step_t)
-
-    up = CGEventCreateMouseEvent(src,
-                                 kCGEventLeftMouseUp,
-                                 (x2, y2),
-                                 kCGMouseButtonLeft)
-    CGEventSetIntegerValueField(up,
-                                kCGMouseEventClickState, 0)
-    CGEventPost(kCGHIDEventTap, up)
+        # Incremental interpolation with hoisted locals: the loop body is the
+        # hottest Python code in a drag, so skip the per-step div and the
+        # LOAD_GLOBAL on every Quartz name.
+        nx, ny = x1, y1
+        dx, dy = (x2 - x1) / steps, (y2 - y1) / steps
+        set_location = CGEventSetLocation
+        set_timestamp = CGEventSetTimestamp
+        post = CGEventPost
+        tap = kCGHIDEventTap
+        time_ns = time.time_ns
+        sleep = asyncio.sleep
+        for _ in range(steps):
+            nx += dx
+            ny += dy
+            set_location(drag, (nx, ny))
+            set_timestamp(drag, int(time_ns()))   # 15+ 必填
+            post(tap, drag)
+            await sleep(step_t)
+
+        up = CGEventCreateMouseEvent(src,
+                                     kCGEventLeftMouseUp,
+                                     (x2, y2),
+                                     kCGMouseButtonLeft)
+        CGEventSetIntegerValueField(up,
+                                    kCGMouseEventClickState, 0)
+        CGEventPost(kCGHIDEventTap, up)
 
 async def _scroll_invisible(lines=1):
-    direction = 1 if lines > 0 else -1
-    for _ in range(abs(lines)):
-        event = Quartz.CGEventCreateScrollWheelEvent(
-            None,
-            Quartz.kCGScrollEventUnitLine,
-            1, 
-            direction       
-        )
-        Quartz.CGEventPost(Quartz.kCGSessionEventTap, event)
-        await asyncio.sleep(0.003)
-        if _==25:
-            break
+    tap, (event,) = _EVENT_TEMPLATES['scroll_up' if lines > 0 else 'scroll_down']
+    with objc.autorelease_pool():
+        # The direction-baked template wheel event is re-timestamped per line.
+        # Clamp here: the controller's scroll actions pass the LLM-supplied
+        # line count straight through, and each line holds the loop ~3ms.
+        for _ in range(min(abs(lines), 25)):
+            Quartz.CGEventSetTimestamp(event, int(time.time_ns()))
+            Quartz.CGEventPost(tap, event)
+            await _precise_sleep_ns(3_000_000)
 
 async def _scroll_invisible_at_position(x, y, lines):
     """
@@ -189,28 +363,14 @@ async def _scroll_invisible_at_position(x, y, lines):
 
 async def left_click_pixel(position) -> bool:
     """Left-click the specified (x, y) in normalized screen coords, invisibly."""
-    screen_w, screen_h = _get_screen_size()
-    if position[0] > 1 and position[1] > 1:
-        abs_x = position[0]/1000 * screen_w
-        abs_y = position[1]/1000 * screen_h
-    else:
-        abs_x = position[0] * screen_w
-        abs_y = position[1] * screen_h
-
+    abs_x, abs_y = _to_abs(position, *_get_screen_size())
     await _click_invisible(abs_x, abs_y, button='left')
     logger.debug(f'✅ Successfully left-clicked pixel at absolute [{abs_x}, {abs_y}]')
     return True
 
 async def right_click_pixel(position) -> bool:
     """Right-click the specified (x, y) in normalized screen coords, invisibly."""
-    screen_w, screen_h = _get_screen_size()
-    if position[0] > 1 and position[1] > 1:
-        abs_x = position[0]/1000 * screen_w
-        abs_y = position[1]/1000 * screen_h
-    else:
-        abs_x = position[0] * screen_w
-        abs_y = position[1] * screen_h
-
+    abs_x, abs_y = _to_abs(position, *_get_screen_size())
     await _click_invisible(abs_x, abs_y, button='right')
     logger.debug(f'✅ Successfully right-clicked pixel at absolute [{abs_x}, {abs_y}]')
     return True
@@ -222,19 +382,8 @@ async def move_to(position) -> bool:
     If you want no visible move at all, you typically do not call 'move_to'—just 
     post mouse events at the target coords directly.
     """
-    screen_w, screen_h = _get_screen_size()
-    if position[0] > 1 and position[1] > 1:
-        abs_x = position[0]/1000 * screen_w
-        abs_y = position[1]/1000 * screen_h
-    else:
-        abs_x = position[0] * screen_w
-        abs_y = position[1] * screen_h
-
-    # _warp_cursor((abs_x, abs_y))
-    move = Quartz.CGEventCreateMouseEvent(None,
-                                      Quartz.kCGEventMouseMoved,
-                                      (abs_x, abs_y), Quartz.kCGMouseButtonLeft)
-    Quartz.CGEventPost(Quartz.kCGSessionEventTap, move)
+    abs_x, abs_y = _to_abs(position, *_get_screen_size())
+    _dispatch('move', abs_x, abs_y)
     logger.debug(f'✅ Successfully moved cursor to absolute [{abs_x}, {abs_y}]')
     return True
 
@@ -245,62 +394,217 @@ async def drag_pixel(start, end) -> bool:
     This uses left-mouse drag invisibly, restoring cursor after the operation.
     """
     screen_w, screen_h = _get_screen_size()
-    if start[0] > 1 and start[1] > 1 and end[0] > 1 and end[1] > 1:
-        x1 = start[0]/1000 * screen_w
-        y1 = start[1]/1000 * screen_h
-        x2 = end[0]/1000 * screen_w
-        y2 = end[1]/1000 * screen_h
-    else:
-        x1 = start[0] * screen_w
-        y1 = start[1] * screen_h
-        x2 = end[0] * screen_w
-        y2 = end[1] * screen_h
+    x1, y1 = _to_abs(start, screen_w, screen_h)
+    x2, y2 = _to_abs(end, screen_w, screen_h)
     await _drag_invisible(x1, y1, x2, y2, button='left')
     logger.debug(f'✅ Successfully dragged from [{x1}, {y1}] to [{x2}, {y2}]')
     return True
 
 
+def _to_pynput_key(key: str):
+    """Map a key name like 'enter' or 'cmd' to a pynput Key; single chars pass through."""
+    if len(key) == 1:
+        return key
+    name = _KEY_ALIASES.get(key.strip().lower(), key.strip().lower())
+    try:
+        return Key[name]
+    except KeyError:
+        return key
+
+# macOS synonyms plus the pyautogui spellings the actions previously accepted,
+# mapped onto pynput's Key names.
+_KEY_ALIASES = {
+    "command": "cmd",
+    "option": "alt",
+    "return": "enter",
+    "control": "ctrl",
+    "escape": "esc",
+    "pagedown": "page_down",
+    "pageup": "page_up",
+    "capslock": "caps_lock",
+    "numlock": "num_lock",
+    "scrolllock": "scroll_lock",
+    "printscreen": "print_screen",
+    "prtsc": "print_screen",
+    "prtscr": "print_screen",
+    "prntscrn": "print_screen",
+    "del": "delete",
+    "altleft": "alt_l",
+    "altright": "alt_r",
+    "optionleft": "alt_l",
+    "optionright": "alt_r",
+    "ctrlleft": "ctrl_l",
+    "ctrlright": "ctrl_r",
+    "shiftleft": "shift_l",
+    "shiftright": "shift_r",
+    "winleft": "cmd_l",
+    "winright": "cmd_r",
+    "win": "cmd",
+    "apps": "menu",
+    "playpause": "media_play_pause",
+    "volumemute": "media_volume_mute",
+    "volumedown": "media_volume_down",
+    "volumeup": "media_volume_up",
+    "nexttrack": "media_next",
+    "prevtrack": "media_previous",
+}
+
 async def press(key: str = "enter") -> bool:
     """
-    Press a single key using PyAutoGUI. 
-    (Alternatively, you could use pynput or Quartz events for keyboard as well.)
+    Press a single key via the shared pynput controller, which binds
+    straight to Quartz with a cached keycode table.
     """
-    pyautogui.press(key)
+    mapped = _to_pynput_key(key)
+    kb.press(mapped)
+    kb.release(mapped)
     logger.info(f"✅ Successfully pressed key: {key}")
     return True
 
-async def _unicode_event(char: str, down: bool):
-    units = len(char.encode("utf-16-le")) // 2      
+# A keyboard event's unicode payload lives in a fixed ~20-UTF-16-unit buffer;
+# CGEventKeyboardSetUnicodeString silently drops anything beyond it.
+_MAX_UNICODE_UNITS = 20
 
-    ev = Quartz.CGEventCreateKeyboardEvent(None, 0, down)
-    Quartz.CGEventKeyboardSetUnicodeString(ev, units, char)
-    Quartz.CGEventPost(Quartz.kCGSessionEventTap, ev)
+def _post_unicode_slice(text: str, units: int):
+    for down in (True, False):
+        ev = Quartz.CGEventCreateKeyboardEvent(_EVENT_SOURCE, 0, down)
+        Quartz.CGEventKeyboardSetUnicodeString(ev, units, text)
+        Quartz.CGEventPost(Quartz.kCGSessionEventTap, ev)
+
+def _post_text_run(run: str):
+    """Post a run of text as event pairs of at most _MAX_UNICODE_UNITS each.
+
+    CGEventKeyboardSetUnicodeString accepts multi-unit strings, so a slice
+    costs two WindowServer round-trips instead of two per character. Slices
+    split on character boundaries so surrogate pairs stay intact.
+    """
+    start = 0
+    units = 0
+    for i, ch in enumerate(run):
+        ch_units = 2 if ord(ch) > 0xFFFF else 1
+        if units + ch_units > _MAX_UNICODE_UNITS:
+            _post_unicode_slice(run[start:i], units)
+            start, units = i, 0
+        units += ch_units
+    if units:
+        _post_unicode_slice(run[start:], units)
+
+# Text Input Services, for checking the active keyboard layout. Keycode
+# presses are translated through the current layout and input method, so the
+# ANSI-US fast path below is only correct on a plain US/ABC layout with no
+# IME in front of it.
+_carbon = ctypes.CDLL(ctypes.util.find_library("Carbon")
+                      or "/System/Library/Frameworks/Carbon.framework/Carbon")
+_carbon.TISCopyCurrentKeyboardInputSource.restype = ctypes.c_void_p
+_carbon.TISGetInputSourceProperty.restype = ctypes.c_void_p
+_carbon.TISGetInputSourceProperty.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+_carbon.CFStringGetCString.argtypes = [
+    ctypes.c_void_p, ctypes.c_char_p, ctypes.c_long, ctypes.c_uint32]
+_carbon.CFRelease.argtypes = [ctypes.c_void_p]
+_kTISPropertyInputSourceID = ctypes.c_void_p.in_dll(
+    _carbon, "kTISPropertyInputSourceID")
+_kCFStringEncodingUTF8 = 0x08000100
+
+_ANSI_US_SOURCE_IDS = {b"com.apple.keylayout.US", b"com.apple.keylayout.ABC"}
+
+def _ansi_us_layout_active() -> bool:
+    """Return True when the current input source is a plain US/ABC layout."""
+    source = None
+    try:
+        source = _carbon.TISCopyCurrentKeyboardInputSource()
+        if not source:
+            return False
+        ref = _carbon.TISGetInputSourceProperty(source, _kTISPropertyInputSourceID)
+        if not ref:
+            return False
+        buf = ctypes.create_string_buffer(128)
+        if not _carbon.CFStringGetCString(ref, buf, len(buf), _kCFStringEncodingUTF8):
+            return False
+        return buf.value in _ANSI_US_SOURCE_IDS
+    except Exception:
+        return False
+    finally:
+        if source:
+            _carbon.CFRelease(source)
+
+def _build_keycodes():
+    """ANSI-US virtual keycodes for ASCII: {char: (keycode, needs_shift)}.
+
+    Unicode-string events bypass the keymap, and some receivers (terminals,
+    IDE autocomplete) only take their fast input path for real keycode
+    presses; ASCII gets keycode events, everything else stays unicode.
+    """
+    base = {
+        'a': 0, 's': 1, 'd': 2, 'f': 3, 'h': 4, 'g': 5, 'z': 6, 'x': 7,
+        'c': 8, 'v': 9, 'b': 11, 'q': 12, 'w': 13, 'e': 14, 'r': 15,
+        'y': 16, 't': 17, '1': 18, '2': 19, '3': 20, '4': 21, '6': 22,
+        '5': 23, '=': 24, '9': 25, '7': 26, '-': 27, '8': 28, '0': 29,
+        ']': 30, 'o': 31, 'u': 32, '[': 33, 'i': 34, 'p': 35, 'l': 37,
+        'j': 38, "'": 39, 'k': 40, ';': 41, '\\': 42, ',': 43, '/': 44,
+        'n': 45, 'm': 46, '.': 47, '`': 50,
+        '\r': 36, '\n': 36, '\t': 48, ' ': 49,
+    }
+    shifted = {
+        '!': '1', '@': '2', '#': '3', '$': '4', '%': '5', '^': '6',
+        '&': '7', '*': '8', '(': '9', ')': '0', '_': '-', '+': '=',
+        '{': '[', '}': ']', '|': '\\', ':': ';', '"': "'", '<': ',',
+        '>': '.', '?': '/', '~': '`',
+    }
+    keycodes = {ch: (code, False) for ch, code in base.items()}
+    for ch in 'abcdefghijklmnopqrstuvwxyz':
+        keycodes[ch.upper()] = (base[ch], True)
+    for ch, unshifted in shifted.items():
+        keycodes[ch] = (base[unshifted], True)
+    return keycodes
+
+_KEYCODES = _build_keycodes()
+_SHIFT_FLAG = Quartz.kCGEventFlagMaskShift
+
+def _post_keycode_char(keycode: int, shift: bool):
+    for down in (True, False):
+        ev = Quartz.CGEventCreateKeyboardEvent(_EVENT_SOURCE, keycode, down)
+        Quartz.CGEventSetFlags(ev, _SHIFT_FLAG if shift else 0)
+        Quartz.CGEventPost(Quartz.kCGSessionEventTap, ev)
 
 async def type_into(text: str):
-    for ch in text:
-        await _unicode_event(ch, True)
-        await _unicode_event(ch, False)
+    with objc.autorelease_pool():
+        # With a non-US layout or an active IME, keycode presses get remapped
+        # or captured by the candidate window; unicode-string events are
+        # layout- and IME-independent, so they are the only safe path there.
+        if not _ansi_us_layout_active():
+            _post_text_run(text)
+            logger.info("✅ Successfully typed the text!")
+            return True
+        # ASCII goes out as real keycode presses (newlines become an actual
+        # return press); consecutive unmapped characters are batched into
+        # unicode-string event pairs.
+        pending = []
+        for ch in text:
+            mapped = _KEYCODES.get(ch)
+            if mapped is None:
+                pending.append(ch)
+                continue
+            if pending:
+                _post_text_run("".join(pending))
+                pending.clear()
+            _post_keycode_char(*mapped)
+        if pending:
+            _post_text_run("".join(pending))
     logger.info("✅ Successfully typed the text!")
     return True
 
 async def press_combination(key1: str, key2: str, key3: Optional[str] = None) -> bool:
     """
     Press a combination of keys (e.g., Command + Shift + 3).
-    Uses PyAutoGUI for convenience. 
+    The leading keys are held while the last one is tapped.
     """
+    keys = [_to_pynput_key(k) for k in (key1, key2, key3) if k is not None]
+    *modifiers, last = keys
+    with kb.pressed(*modifiers):
+        kb.press(last)
+        kb.release(last)
     if key3 is not None:
-        pyautogui.keyDown(key1)
-        pyautogui.keyDown(key2)
-        pyautogui.keyDown(key3)
-        pyautogui.keyUp(key3)
-        pyautogui.keyUp(key2)
-        pyautogui.keyUp(key1)
         logger.info(f"✅ Successfully pressed the combination: {key1} + {key2} + {key3}")
     else:
-        pyautogui.keyDown(key1)
-        pyautogui.keyDown(key2)
-        pyautogui.keyUp(key2)
-        pyautogui.keyUp(key1)
         logger.info(f"✅ Successfully pressed the combination: {key1} + {key2}")
     return True
 